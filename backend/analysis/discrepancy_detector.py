@@ -5,19 +5,74 @@ Analyzes cauldron time-series data to detect potion theft by comparing
 calculated drain volumes with official transport tickets.
 
 Key Functions:
+- group_by_cauldron: Parses records into per-cauldron timestamp/level arrays
 - calculate_fill_rates: Determines fill rate for each cauldron
-- detect_all_drains_from_records: Identifies drain events and calculates true volumes
+- detect_drains / detect_all_drains_from_records: Identifies drain events and calculates true volumes
 - match_tickets: Compares calculated drains with official tickets
 """
 
+import json
+import logging
+
+import numpy as np
 import requests
-from datetime import datetime, timezone
-from typing import List, Dict, Any, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; scan_drains falls back to NumPy
+    njit = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; get_data_from_api falls back to response.json()
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; decode_records falls back to untyped JSON decoding
+    msgspec = None
+
+try:
+    from ciso8601 import parse_datetime as parse_iso_datetime
+except ImportError:  # ciso8601 is optional; to_datetime falls back to fromisoformat
+    parse_iso_datetime = None
+
+logger = logging.getLogger(__name__)
+
 # The EOG API base URL
 API_BASE_URL = "https://hackutd2025.eog.systems"
 
+# Timestamps are handled as int64 nanoseconds since the Unix epoch
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NS_PER_MINUTE = 60_000_000_000
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Errors that mean an API call produced no usable payload (orjson and json raise ValueError subclasses)
+FETCH_ERRORS = (requests.RequestException, ValueError) + ((msgspec.DecodeError,) if msgspec else ())
+
+if msgspec:
+    class Reading(msgspec.Struct):
+        """One /api/Data sample: a timestamp and the level of every cauldron at it."""
+        timestamp: str
+        cauldron_levels: Dict[str, float] = {}
+
+    _RECORDS_DECODER = msgspec.json.Decoder(List[Reading])
+
+# Pooled keep-alive session for API calls; retries transient gateway errors
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504], raise_on_status=False),
+))
+
 
 def get_data_from_api(endpoint: str) -> Any:
     """
@@ -31,28 +86,185 @@ def get_data_from_api(endpoint: str) -> Any:
     """
     try:
         url = f"{API_BASE_URL}{endpoint}"
-        response = requests.get(url, timeout=60)
+        response = SESSION.get(url, timeout=(2, 60))
         response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        print(f"Error fetching data from {endpoint}: {e}")
+        if endpoint.startswith("/api/Data"):
+            return decode_records(response.content)
+        return orjson.loads(response.content) if orjson else response.json()
+    except FETCH_ERRORS as e:
+        logger.warning("Error fetching data from %s: %s", endpoint, e)
         return None
 
 
+def decode_records(body: bytes) -> List[Any]:
+    """
+    Decode an /api/Data response body into time-series records.
+    
+    With msgspec installed the body is decoded straight into typed
+    Reading structs, which is faster and lighter than building a dict per
+    record; otherwise (or if the payload does not fit the schema) plain
+    dicts are returned. group_by_cauldron accepts either form.
+    
+    Args:
+        body: Raw JSON bytes from api/Data
+    
+    Returns:
+        List of Reading structs or record dicts
+    """
+    if msgspec:
+        try:
+            return _RECORDS_DECODER.decode(body)
+        except msgspec.ValidationError as e:
+            logger.debug("api/Data payload does not match Reading, decoding untyped: %s", e)
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+def get_many_from_api(endpoints: List[str]) -> List[Any]:
+    """
+    Fetch several EOG API endpoints concurrently.
+    
+    Wall time is that of the slowest call rather than the sum of all of
+    them; the pooled session serves each request on its own connection.
+    
+    Args:
+        endpoints: API endpoint paths, as accepted by get_data_from_api
+    
+    Returns:
+        JSON responses in the same order as endpoints (None for failed calls)
+    """
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+        return list(pool.map(get_data_from_api, endpoints))
+
+
+def _parse_timestamp(timestamp_str: str) -> datetime:
+    """
+    Parse an ISO timestamp string into a UTC datetime (uncached).
+    
+    Args:
+        timestamp_str: ISO format timestamp string
+    
+    Returns:
+        datetime object in UTC
+    """
+    if parse_iso_datetime is not None:
+        dt = parse_iso_datetime(timestamp_str)
+    else:
+        if timestamp_str.endswith("Z"):
+            timestamp_str = timestamp_str[:-1] + "+00:00"
+        dt = datetime.fromisoformat(timestamp_str)
+    if dt.tzinfo is timezone.utc:
+        return dt
+    return dt.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=65536)
 def to_datetime(timestamp_str: str) -> datetime:
     """
     Convert ISO timestamp string to datetime object.
     
+    Results are memoized: every record timestamp is shared by all of its
+    cauldron readings and repeats across requests.
+    
     Args:
         timestamp_str: ISO format timestamp string
     
     Returns:
         datetime object in UTC
     """
-    return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00")).astimezone(timezone.utc)
+    return _parse_timestamp(timestamp_str)
+
+
+@lru_cache(maxsize=65536)
+def to_epoch_ns(timestamp_str: str) -> int:
+    """
+    Convert ISO timestamp string to integer nanoseconds since the Unix epoch.
+    
+    Only the integer is cached; the intermediate datetime is not, so the
+    analysis path holds 8 bytes per timestamp instead of a datetime object.
+    
+    Args:
+        timestamp_str: ISO format timestamp string
+    
+    Returns:
+        Nanoseconds since 1970-01-01T00:00:00Z
+    """
+    return (_parse_timestamp(timestamp_str) - EPOCH) // ONE_MICROSECOND * 1000
+
+
+def to_date_key(timestamp_str: str) -> str:
+    """
+    Get the UTC calendar day (YYYY-MM-DD) of an ISO date or timestamp string.
+    
+    UTC strings already start with the day, so they are sliced directly;
+    anything else is parsed and converted to UTC first.
+    
+    Args:
+        timestamp_str: ISO format date or timestamp string
+    
+    Returns:
+        Date string in YYYY-MM-DD format
+    """
+    if (len(timestamp_str) == 10 or timestamp_str.endswith(("Z", "+00:00"))) and timestamp_str[4:5] == "-":
+        return timestamp_str[:10]
+    return to_datetime(timestamp_str).strftime("%Y-%m-%d")
+
+
+def from_epoch_ns(ts_ns: int) -> datetime:
+    """
+    Convert integer nanoseconds since the Unix epoch back to a UTC datetime.
+    
+    Args:
+        ts_ns: Nanoseconds since 1970-01-01T00:00:00Z
+    
+    Returns:
+        datetime object in UTC
+    """
+    return EPOCH + timedelta(microseconds=ts_ns // 1000)
+
+
+def group_by_cauldron(records: List[Dict]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Group time-series records into per-cauldron NumPy arrays.
+    
+    Records are walked once; the result is shared by the fill-rate
+    calculation and the drain scan so the payload is only parsed once.
+    
+    Args:
+        records: List of time-series data from api/Data, as dicts or
+            Reading structs (see decode_records)
+    
+    Returns:
+        Dictionary mapping {cauldron_id: (timestamps_ns, levels)}, where
+        timestamps are int64 nanoseconds and levels are float64, both
+        sorted chronologically
+    """
+    samples = defaultdict(list)
+    
+    if records and not isinstance(records[0], dict):
+        rows = ((r.timestamp, r.cauldron_levels) for r in records)
+    else:
+        rows = ((r["timestamp"], r.get("cauldron_levels", {})) for r in records)
+    
+    for timestamp, cauldron_levels in rows:
+        ts_ns = to_epoch_ns(timestamp)
+        
+        for cauldron_id, level in cauldron_levels.items():
+            samples[cauldron_id].append((ts_ns, float(level)))
+    
+    grouped = {}
+    for cauldron_id, points in samples.items():
+        ts = np.fromiter((t for t, _ in points), dtype=np.int64, count=len(points))
+        lvl = np.fromiter((v for _, v in points), dtype=np.float64, count=len(points))
+        # Upstream data is usually chronological already; only sort when it is not
+        if not np.all(ts[1:] >= ts[:-1]):
+            order = np.argsort(ts, kind="stable")
+            ts, lvl = ts[order], lvl[order]
+        grouped[cauldron_id] = (ts, lvl)
+    
+    return grouped
 
 
-def calculate_fill_rates(records: List[Dict]) -> Dict[str, float]:
+def calculate_fill_rates(grouped: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Dict[str, float]:
     """
     STEP 1: Calculate the fill rate (L/min) for each cauldron.
     
@@ -62,66 +274,142 @@ def calculate_fill_rates(records: List[Dict]) -> Dict[str, float]:
     - Use the median rate to avoid outliers
     
     Args:
-        records: List of time-series data from api/Data
+        grouped: Per-cauldron series from group_by_cauldron()
     
     Returns:
         Dictionary mapping {cauldron_id: fill_rate_in_L_per_min}
     """
-    print("📊 Calculating fill rates for each cauldron...")
+    logger.debug("📊 Calculating fill rates for each cauldron...")
     
-    # Group records by cauldron
-    cauldron_data = defaultdict(list)
-    
-    for record in records:
-        timestamp = to_datetime(record["timestamp"])
-        cauldron_levels = record.get("cauldron_levels", {})
-        
-        for cauldron_id, level in cauldron_levels.items():
-            cauldron_data[cauldron_id].append({
-                "timestamp": timestamp,
-                "level": float(level)
-            })
-    
-    # Calculate fill rates for each cauldron
     fill_rates = {}
     
-    for cauldron_id, data_points in cauldron_data.items():
-        # Sort by timestamp
-        data_points.sort(key=lambda x: x["timestamp"])
-        
-        rates = []
-        
+    for cauldron_id, (ts, lvl) in grouped.items():
         # Look at consecutive pairs of points
-        for i in range(1, len(data_points)):
-            prev = data_points[i - 1]
-            curr = data_points[i]
-            
-            time_diff_minutes = (curr["timestamp"] - prev["timestamp"]).total_seconds() / 60.0
-            level_diff = curr["level"] - prev["level"]
-            
-            # Only consider periods where level is INCREASING (filling, not draining)
-            if level_diff > 0 and time_diff_minutes > 0:
-                rate = level_diff / time_diff_minutes
-                rates.append(rate)
+        dt_min = np.diff(ts) / NS_PER_MINUTE
+        dl = np.diff(lvl)
+        
+        # Only consider periods where level is INCREASING (filling, not draining)
+        mask = (dl > 0) & (dt_min > 0)
         
         # Use median to avoid outliers
-        if rates:
-            rates.sort()
-            median_rate = rates[len(rates) // 2]
+        if mask.any():
+            median_rate = float(np.median(dl[mask] / dt_min[mask]))
             fill_rates[cauldron_id] = median_rate
-            print(f"  ✓ Cauldron {cauldron_id}: {median_rate:.2f} L/min")
+            logger.debug("  ✓ Cauldron %s: %.2f L/min", cauldron_id, median_rate)
         else:
             fill_rates[cauldron_id] = 0.0
-            print(f"  ⚠️ Cauldron {cauldron_id}: No fill rate detected (no increasing periods)")
+            logger.debug("  ⚠️ Cauldron %s: No fill rate detected (no increasing periods)", cauldron_id)
     
     return fill_rates
 
 
+def find_drain_spans(lvl: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate drain events in a chronologically sorted level series.
+    
+    A drain starts at the first drop (level decreases) and continues while
+    the level keeps dropping or stays flat; it ends at the last point before
+    the level rises again (or at the final sample).
+    
+    Args:
+        lvl: Cauldron levels sorted by timestamp
+    
+    Returns:
+        Tuple of (start_indices, end_indices) into lvl
+    """
+    dl = np.diff(lvl)
+    rises = np.flatnonzero(dl > 0)
+    drops = np.flatnonzero(dl < 0)
+    if drops.size == 0:
+        return drops, drops
+    
+    # Each run of non-rising steps is one drain, starting at its first drop
+    run_ids = np.searchsorted(rises, drops)
+    starts = drops[np.r_[True, run_ids[1:] != run_ids[:-1]]]
+    
+    # Each drain ends at the first rise after its start
+    next_rise = np.searchsorted(rises, starts)
+    ends = np.full(starts.shape, len(lvl) - 1)
+    has_rise = next_rise < rises.size
+    ends[has_rise] = rises[next_rise[has_rise]]
+    return starts, ends
+
+
+def scan_drains_vectorized(ts_ns: np.ndarray, lvl: np.ndarray,
+                           fill_rate: float, min_volume: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    NumPy implementation of scan_drains, used when Numba is not installed.
+    """
+    starts, ends = find_drain_spans(lvl)
+    drain_times = (ts_ns[ends] - ts_ns[starts]) / NS_PER_MINUTE
+    volumes = (lvl[starts] - lvl[ends]) + fill_rate * drain_times
+    significant = volumes > min_volume
+    return starts[significant], ends[significant], volumes[significant]
+
+
+def scan_drains_loop(ts_ns: np.ndarray, lvl: np.ndarray,
+                     fill_rate: float, min_volume: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scalar drain scan over consecutive samples, compiled with Numba when available.
+    """
+    n = lvl.shape[0]
+    starts = np.empty(n, dtype=np.int64)
+    ends = np.empty(n, dtype=np.int64)
+    volumes = np.empty(n, dtype=np.float64)
+    count = 0
+    
+    i = 0
+    while i < n - 1:
+        # Look for start of a drain (level drop)
+        if lvl[i + 1] < lvl[i]:
+            # Continue while level is dropping or stable (not increasing)
+            end = i + 1
+            while end < n - 1 and lvl[end + 1] <= lvl[end]:
+                end += 1
+            
+            drain_time = (ts_ns[end] - ts_ns[i]) / NS_PER_MINUTE
+            volume = (lvl[i] - lvl[end]) + fill_rate * drain_time
+            if volume > min_volume:
+                starts[count] = i
+                ends[count] = end
+                volumes[count] = volume
+                count += 1
+            
+            # Move past this drain
+            i = end
+        else:
+            i += 1
+    
+    return starts[:count], ends[:count], volumes[:count]
+
+
+# scan_drains(ts_ns, lvl, fill_rate, min_volume) -> (starts, ends, volumes)
+# Compiled once per install thanks to cache=True
+if njit is not None:
+    scan_drains = njit(cache=True)(scan_drains_loop)
+else:
+    scan_drains = scan_drains_vectorized
+
+
 def detect_all_drains_from_records(records: List[Dict]) -> List[Dict]:
     """
     Find all drain events and calculate their true volumes.
     
     This is the core detection function called by the API endpoints.
+    Callers that already grouped the records should use detect_drains().
+    
+    Args:
+        records: List of time-series data from api/Data
+    
+    Returns:
+        List of drain events with calculated volumes
+    """
+    return detect_drains(group_by_cauldron(records))
+
+
+def detect_drains(grouped: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> List[Dict]:
+    """
+    Find all drain events in pre-grouped series and calculate their true volumes.
     
     Algorithm:
     1. Calculate fill rates for all cauldrons
@@ -135,102 +423,93 @@ def detect_all_drains_from_records(records: List[Dict]) -> List[Dict]:
     - We compensate by adding back the volume that filled during the drain
     
     Args:
-        records: List of time-series data from api/Data
+        grouped: Per-cauldron series from group_by_cauldron()
     
     Returns:
         List of drain events with calculated volumes
     """
-    print("\n🔍 Detecting drain events...")
+    logger.debug("🔍 Detecting drain events...")
     
     # Step 1: Calculate fill rates
-    fill_rates = calculate_fill_rates(records)
+    fill_rates = calculate_fill_rates(grouped)
     
-    # Step 2: Group records by cauldron
-    cauldron_data = defaultdict(list)
+    # Step 2: Find drain events for each cauldron, accumulating parallel
+    # columns (one entry per drain) instead of a dict per drain
+    cauldron_ids: List[str] = []
+    fill_rate_col: List[float] = []
+    start_ns, end_ns, levels_before, levels_after, volumes = [], [], [], [], []
     
-    for record in records:
-        timestamp = to_datetime(record["timestamp"])
-        cauldron_levels = record.get("cauldron_levels", {})
-        
-        for cauldron_id, level in cauldron_levels.items():
-            cauldron_data[cauldron_id].append({
-                "timestamp": timestamp,
-                "level": float(level)
-            })
-    
-    # Step 3: Find drain events for each cauldron
-    all_drains = []
-    
-    for cauldron_id, data_points in cauldron_data.items():
-        # Sort by timestamp
-        data_points.sort(key=lambda x: x["timestamp"])
-        
+    for cauldron_id, (ts, lvl) in grouped.items():
         fill_rate = fill_rates.get(cauldron_id, 0.0)
         
-        # Scan for drain events (consecutive points where level drops)
-        i = 0
-        while i < len(data_points) - 1:
-            # Look for start of a drain (level drop)
-            if data_points[i + 1]["level"] < data_points[i]["level"]:
-                # Found a drain! Now find where it ends
-                drain_start_idx = i
-                drain_end_idx = i + 1
-                
-                # Continue while level is dropping or stable (not increasing)
-                while (drain_end_idx < len(data_points) - 1 and 
-                       data_points[drain_end_idx + 1]["level"] <= data_points[drain_end_idx]["level"]):
-                    drain_end_idx += 1
-                
-                # Calculate drain details
-                level_before = data_points[drain_start_idx]["level"]
-                level_after = data_points[drain_end_idx]["level"]
-                start_time = data_points[drain_start_idx]["timestamp"]
-                end_time = data_points[drain_end_idx]["timestamp"]
-                
-                drain_time_minutes = (end_time - start_time).total_seconds() / 60.0
-                
-                # Apply volume compensation formula
-                # Accounts for continued filling during the drain operation
-                observed_drop = level_before - level_after
-                filled_during_drain = fill_rate * drain_time_minutes
-                true_volume = observed_drop + filled_during_drain
-                
-                # Only record significant drains (> 1L to filter noise)
-                if true_volume > 1.0:
-                    drain_event = {
-                        "cauldron_id": cauldron_id,
-                        "start_time": start_time.isoformat(),
-                        "end_time": end_time.isoformat(),
-                        "date": start_time.strftime("%Y-%m-%d"),  # For grouping by day
-                        "level_before": level_before,
-                        "level_after": level_after,
-                        "drain_time_minutes": drain_time_minutes,
-                        "fill_rate": fill_rate,
-                        "true_volume": round(true_volume, 2)
-                    }
-                    all_drains.append(drain_event)
-                    print(f"  🚨 Drain detected in {cauldron_id} on {drain_event['date']}: {true_volume:.2f}L")
-                
-                # Move past this drain
-                i = drain_end_idx
-            else:
-                i += 1
+        # Scan for drain events (consecutive points where level drops) and
+        # apply the volume compensation formula, which accounts for continued
+        # filling during the drain operation.
+        # Only significant drains (> 1L) are kept to filter noise.
+        starts, ends, true_volumes = scan_drains(ts, lvl, fill_rate, 1.0)
+        if starts.size == 0:
+            continue
+        
+        cauldron_ids.extend([cauldron_id] * starts.size)
+        fill_rate_col.extend([fill_rate] * starts.size)
+        start_ns.append(ts[starts])
+        end_ns.append(ts[ends])
+        levels_before.append(lvl[starts])
+        levels_after.append(lvl[ends])
+        volumes.append(true_volumes)
+    
+    if not cauldron_ids:
+        logger.info("✅ Found 0 total drain events")
+        return []
     
-    print(f"\n✅ Found {len(all_drains)} total drain events")
+    # Step 3: Materialize the JSON-ready drain events in one pass
+    start_ns_all = np.concatenate(start_ns)
+    end_ns_all = np.concatenate(end_ns)
+    drain_minutes = (end_ns_all - start_ns_all) / NS_PER_MINUTE
+    start_times = [from_epoch_ns(t).isoformat() for t in start_ns_all.tolist()]
+    end_times = [from_epoch_ns(t).isoformat() for t in end_ns_all.tolist()]
+    
+    all_drains = [
+        {
+            "cauldron_id": cauldron_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "date": start_time[:10],  # For grouping by day (start_time is UTC)
+            "level_before": level_before,
+            "level_after": level_after,
+            "drain_time_minutes": drain_time_minutes,
+            "fill_rate": fill_rate,
+            "true_volume": round(true_volume, 2)
+        }
+        for cauldron_id, start_time, end_time, level_before, level_after,
+            drain_time_minutes, fill_rate, true_volume in zip(
+            cauldron_ids, start_times, end_times,
+            np.concatenate(levels_before).tolist(), np.concatenate(levels_after).tolist(),
+            drain_minutes.tolist(), fill_rate_col, np.concatenate(volumes).tolist()
+        )
+    ]
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        for drain_event in all_drains:
+            logger.debug("  🚨 Drain detected in %s on %s: %.2fL",
+                         drain_event["cauldron_id"], drain_event["date"], drain_event["true_volume"])
+    
+    logger.info("✅ Found %d total drain events", len(all_drains))
     return all_drains
 
 
 def match_tickets(drains: List[Dict], tickets: List[Dict], 
                   eps_pct: float = 0.05, eps_abs: float = 5.0, 
-                  dummy_penalty: float = 50.0) -> List[Dict]:
+                  dummy_penalty: float = 50.0,
+                  cauldron_info: Optional[Dict[str, str]] = None) -> List[Dict]:
     """
     Compare calculated drains with official tickets to find discrepancies.
     
     This function is called by the API to identify potential theft incidents.
     
     Process:
-    1. Group drains by date and cauldron
-    2. Group tickets by date and cauldron
+    1. Collect drain and ticket volumes keyed by date and cauldron
+    2. Sum them per (date, cauldron) cell with NumPy scatter-adds
     3. Compare expected (tickets) vs actual (calculated drains)
     4. Identify discrepancies (missing or excess volume)
     
@@ -240,91 +519,101 @@ def match_tickets(drains: List[Dict], tickets: List[Dict],
         eps_pct: Percentage tolerance for matching (default 5%)
         eps_abs: Absolute tolerance in liters (default 5L)
         dummy_penalty: Penalty for unmatched items
+        cauldron_info: Optional {cauldron_id: name} mapping for reporting;
+            IDs are used as names when omitted
     
     Returns:
         List of discrepancy objects with expected, actual, and missing volumes
     """
-    print("\n🔎 Comparing drains with tickets to find discrepancies...")
+    logger.debug("🔎 Comparing drains with tickets to find discrepancies...")
     
-    # Step 1: Fetch cauldron names for better reporting
-    cauldron_info = {}
-    try:
-        cauldrons_data = get_data_from_api("/api/Information/cauldrons")
-        if cauldrons_data:
-            for cauldron in cauldrons_data:
-                cauldron_info[cauldron["id"]] = cauldron.get("name", cauldron["id"])
-    except Exception as e:
-        print(f"  ⚠️ Could not fetch cauldron names: {e}")
-    
-    # Step 2: Group drains by (date, cauldron_id)
-    drains_by_day = defaultdict(lambda: defaultdict(float))
-    
-    for drain in drains:
-        date = drain["date"]
-        cauldron_id = drain["cauldron_id"]
-        volume = drain["true_volume"]
-        drains_by_day[date][cauldron_id] += volume
-    
-    # Step 3: Group tickets by (date, cauldron_id)
+    # Step 1: Resolve cauldron names for better reporting
+    cauldron_info = cauldron_info or {}
+    
+    # Step 2: Collect drain volumes as (date, cauldron_id, volume) columns
+    dates = [drain["date"] for drain in drains]
+    cauldron_ids = [drain["cauldron_id"] for drain in drains]
+    volumes = [drain["true_volume"] for drain in drains]
+    n_drains = len(drains)
+    
+    # Only include dates where we have actual drain data (cauldron readings)
+    # This excludes dates with tickets but no monitoring data
+    if n_drains == 0:
+        logger.info("✅ Analysis complete: 0 records checked")
+        return []
+    drain_dates = set(dates)
+    
+    # Step 3: Append ticket volumes to the same columns
     # Note: tickets might be in a wrapper object
     if isinstance(tickets, dict):
         tickets = tickets.get("transport_tickets", [])
     
-    tickets_by_day = defaultdict(lambda: defaultdict(float))
-    
     for ticket in tickets:
-        # Get the date (already in YYYY-MM-DD format)
+        # Get the date (normally already in YYYY-MM-DD format)
         date = ticket.get("date")
         if date:
             try:
+                date = to_date_key(date)
                 cauldron_id = ticket.get("cauldron_id") or ticket.get("cauldronId")
                 # API uses "amount_collected" not "volume"
                 volume = float(ticket.get("amount_collected", 0))
-                tickets_by_day[date][cauldron_id] += volume
             except Exception as e:
-                print(f"  ⚠️ Error parsing ticket: {e}")
+                logger.warning("  ⚠️ Error parsing ticket: %s", e)
                 continue
-    
-    # Step 4: Compare and find discrepancies
+            if not cauldron_id:
+                logger.warning("  ⚠️ Ticket without cauldron id skipped: %s", ticket.get("ticket_id"))
+                continue
+            if date in drain_dates:
+                dates.append(date)
+                cauldron_ids.append(cauldron_id)
+                volumes.append(volume)
+    
+    # Step 4: Sum volumes per (date, cauldron) cell with a scatter-add
+    date_keys, date_idx = np.unique(np.asarray(dates), return_inverse=True)
+    cauldron_keys, cauldron_idx = np.unique(np.asarray(cauldron_ids), return_inverse=True)
+    shape = (date_keys.size, cauldron_keys.size)
+    volume_col = np.asarray(volumes, dtype=np.float64)
+    
+    actual = np.zeros(shape)
+    np.add.at(actual, (date_idx[:n_drains], cauldron_idx[:n_drains]), volume_col[:n_drains])
+    expected = np.zeros(shape)
+    np.add.at(expected, (date_idx[n_drains:], cauldron_idx[n_drains:]), volume_col[n_drains:])
+    present = np.zeros(shape, dtype=bool)
+    present[date_idx, cauldron_idx] = True
+    missing = actual - expected
+    
+    # Step 5: Report every populated cell, ordered by date then cauldron
     discrepancies = []
     
-    # Only include dates where we have actual drain data (cauldron readings)
-    # This excludes dates with tickets but no monitoring data
-    all_dates = set(drains_by_day.keys())
-    
-    for date in sorted(all_dates):
-        drain_cauldrons = drains_by_day.get(date, {})
-        ticket_cauldrons = tickets_by_day.get(date, {})
+    for di, ci in zip(*np.nonzero(present)):
+        date = str(date_keys[di])
+        cauldron_id = str(cauldron_keys[ci])
+        actual_volume = float(actual[di, ci])
+        expected_volume = float(expected[di, ci])
+        missing_volume = float(missing[di, ci])
         
-        all_cauldrons = set(drain_cauldrons.keys()) | set(ticket_cauldrons.keys())
+        cauldron_name = cauldron_info.get(cauldron_id, cauldron_id)
         
-        for cauldron_id in all_cauldrons:
-            actual_volume = drain_cauldrons.get(cauldron_id, 0.0)
-            expected_volume = ticket_cauldrons.get(cauldron_id, 0.0)
-            missing_volume = actual_volume - expected_volume
-            
-            cauldron_name = cauldron_info.get(cauldron_id, cauldron_id)
-            
-            discrepancy = {
-                "date": date,
-                "cauldron_id": cauldron_id,
-                "cauldron_name": cauldron_name,
-                "expected_volume": round(expected_volume, 2),
-                "actual_volume": round(actual_volume, 2),
-                "missing_volume": round(missing_volume, 2)
-            }
-            
-            discrepancies.append(discrepancy)
-            
-            if abs(missing_volume) > eps_abs:
-                if missing_volume > 0:
-                    print(f"  🚨 THEFT DETECTED on {date} at {cauldron_name}: {missing_volume:.2f}L missing!")
-                else:
-                    print(f"  ℹ️ Extra tickets on {date} at {cauldron_name}: {-missing_volume:.2f}L")
+        discrepancy = {
+            "date": date,
+            "cauldron_id": cauldron_id,
+            "cauldron_name": cauldron_name,
+            "expected_volume": round(expected_volume, 2),
+            "actual_volume": round(actual_volume, 2),
+            "missing_volume": round(missing_volume, 2)
+        }
+        
+        discrepancies.append(discrepancy)
+        
+        if abs(missing_volume) > eps_abs:
+            if missing_volume > 0:
+                logger.debug("  🚨 THEFT DETECTED on %s at %s: %.2fL missing!", date, cauldron_name, missing_volume)
             else:
-                print(f"  ✅ Match on {date} at {cauldron_name}: {expected_volume:.2f}L")
+                logger.debug("  ℹ️ Extra tickets on %s at %s: %.2fL", date, cauldron_name, -missing_volume)
+        else:
+            logger.debug("  ✅ Match on %s at %s: %.2fL", date, cauldron_name, expected_volume)
     
-    print(f"\n✅ Analysis complete: {len(discrepancies)} records checked")
+    logger.info("✅ Analysis complete: %d records checked", len(discrepancies))
     return discrepancies
 
 
@@ -336,18 +625,25 @@ def find_discrepancies():
     Note: Direct usage of detect_all_drains_from_records() and match_tickets()
     is preferred for better control and flexibility.
     """
-    print("⚠️ Warning: Using legacy find_discrepancies() function")
-    print("   Consider using detect_all_drains_from_records() and match_tickets() directly")
-    
-    # Fetch data directly
-    records = get_data_from_api("/api/Data?start_date=0&end_date=2000000000")
-    tickets_data = get_data_from_api("/api/Tickets")
+    logger.warning(
+        "⚠️ Using legacy find_discrepancies() function; "
+        "consider using detect_all_drains_from_records() and match_tickets() directly"
+    )
+    
+    # Fetch data directly, all three calls in flight at once
+    records, tickets_data, cauldrons_data = get_many_from_api([
+        "/api/Data?start_date=0&end_date=2000000000",
+        "/api/Tickets",
+        "/api/Information/cauldrons",
+    ])
+    cauldrons_data = cauldrons_data or []
     
     if not records or not tickets_data:
         return []
     
     # Use the new functions
     drains = detect_all_drains_from_records(records)
-    discrepancies = match_tickets(drains, tickets_data)
+    cauldron_info = {c["id"]: c.get("name", c["id"]) for c in cauldrons_data}
+    discrepancies = match_tickets(drains, tickets_data, cauldron_info=cauldron_info)
     
     return discrepancies
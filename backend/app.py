@@ -1,46 +1,79 @@
 from __future__ import annotations
 
 import os
+
+# Under gunicorn's gevent workers, patch sockets before requests/urllib3 are imported so
+# concurrent upstream EOG calls yield to each other instead of blocking the worker
+if os.getenv("GEVENT_PATCH", "").lower() in ("1", "true", "yes"):
+    from gevent import monkey
+    monkey.patch_all()
+
+import hashlib
+import json
+import logging
+import socket
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache, wraps
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, has_request_context, jsonify, make_response, request, url_for
+from flask.json.provider import DefaultJSONProvider
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    orjson = None
+try:
+    import redis
+except ImportError:  # redis is optional; rendered responses are then cached in-process
+    redis = None
+try:
+    from flask_compress import Compress
+except ImportError:  # flask-compress is optional; responses are then sent uncompressed
+    Compress = None
 try:
-    from flask_cors import CORS
-except Exception:
-    CORS = None
+    import prometheus_client
+except ImportError:  # prometheus_client is optional; metrics are then not recorded
+    prometheus_client = None
+try:
+    from prometheus_flask_exporter import PrometheusMetrics
+    from prometheus_flask_exporter.multiprocess import MultiprocessInternalPrometheusMetrics
+except ImportError:  # without the exporter there is no /metrics route or per-endpoint latency
+    PrometheusMetrics = None
+try:
+    import httpx
+except ImportError:  # httpx is optional; only needed for UPSTREAM_HTTP2
+    httpx = None
 
 import math
+import numpy as np
 import requests
+from cachetools import LRUCache, TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
 
 # Configure module import paths for analysis package
 HERE = os.path.abspath(os.path.dirname(__file__))
 if HERE not in sys.path:
     sys.path.insert(0, HERE)
-ANALYSIS_DIR = os.path.join(HERE, "analysis")
-if os.path.isdir(ANALYSIS_DIR) and ANALYSIS_DIR not in sys.path:
-    sys.path.insert(0, ANALYSIS_DIR)
 
-# Import discrepancy detection functions with fallback support
-try:
-    from analysis.discrepancy_detector import (  # type: ignore
-        detect_all_drains_from_records,
-        match_tickets,
-    )
-    USING_FALLBACK = False
-except Exception:
-    try:
-        from discrepancy_detector1 import (  # type: ignore
-            detect_all_drains_from_records,
-            match_tickets,
-        )
-        USING_FALLBACK = True
-    except Exception as e:
-        raise ImportError(
-            "Could not import discrepancy detector module. "
-            "Ensure backend/analysis/discrepancy_detector.py exists."
-        ) from e
+# Analysis jobs for the 202 + poll API (Celery when configured, in-process otherwise)
+import tasks
+
+# Import discrepancy detection functions
+from analysis.discrepancy_detector import (  # type: ignore
+    NS_PER_MINUTE,
+    decode_records,
+    detect_drains,
+    from_epoch_ns,
+    group_by_cauldron,
+    match_tickets,
+)
 
 # EOG API configuration and endpoints
 BASE_URL = os.getenv("CAULDRON_API_BASE", "https://hackutd2025.eog.systems")
@@ -52,108 +85,603 @@ ENDPOINTS = {
     "network": f"{BASE_URL}/api/Information/network",
 }
 
+# Upstream response cache TTLs (seconds); near-static lookups live longer than readings
+DEFAULT_CACHE_TTL = 30
+CACHE_TTLS = {
+    ENDPOINTS["data"]: 15,
+    ENDPOINTS["cauldrons"]: 300,
+    ENDPOINTS["market"]: 300,
+    ENDPOINTS["network"]: 300,
+}
+
+# Caches of response bodies are bounded by total body bytes rather than entry count, since
+# ranged /api/Data bodies vary from a few KB to tens of MB and their keys are client-chosen
+UPSTREAM_CACHE_BYTES = int(os.getenv("UPSTREAM_CACHE_BYTES", str(128 * 2**20)))
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 2**20)))
+
+def body_size(entry: Any) -> int:
+    return len(entry.body)
+
+class _BodyBudget:
+    # A body larger than the whole budget is not cached (cachetools would raise ValueError)
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if self.getsizeof(value) > self.maxsize:
+            self.pop(key, None)
+            return
+        super().__setitem__(key, value)
+
+class BodyTTLCache(_BodyBudget, TTLCache):
+    pass
+
+class BodyLRUCache(_BodyBudget, LRUCache):
+    pass
+
+_FETCH_CACHES = {
+    ttl: BodyTTLCache(maxsize=UPSTREAM_CACHE_BYTES, ttl=ttl, getsizeof=body_size)
+    for ttl in {DEFAULT_CACHE_TTL, *CACHE_TTLS.values()}
+}
+_FETCH_LOCK = threading.Lock()
+
+# Last seen body per (url, params), kept past TTL expiry for conditional re-fetches.
+# The raw bytes are forwarded as-is by pass-through routes; payload is decoded on first use.
+class UpstreamEntry(NamedTuple):
+    etag: Optional[str]
+    digest: str
+    body: bytes
+    content_type: str
+    payload: Any = None
+
+_UPSTREAM_ENTRIES: LRUCache = BodyLRUCache(maxsize=UPSTREAM_CACHE_BYTES, getsizeof=body_size)
+
+# Grouped series and detected drains per /api/Data body digest
+_ANALYSIS_CACHE: LRUCache = LRUCache(maxsize=8)
+
+# Discrepancy results per (start, end); concurrent misses share one in-flight computation
+_DISCREPANCY_CACHE: TTLCache = TTLCache(maxsize=4, ttl=15)
+_INFLIGHT: Dict[Any, Future] = {}
+
+# Default-range discrepancies, recomputed off the request path when DISCREPANCY_REFRESH_SECONDS > 0
+DISCREPANCY_REFRESH_SECONDS = float(os.getenv("DISCREPANCY_REFRESH_SECONDS", "0"))
+DEFAULT_RANGE = (0, 2_000_000_000)
+
+class Snapshot(NamedTuple):
+    body: bytes
+    taken_at: float
+
+_DISCREPANCY_SNAPSHOT: Optional[Snapshot] = None
+
+# Rendered pass-through responses, in Redis when REDIS_URL is set and in-process otherwise.
+# Entries outlive their freshness TTL so a failing upstream can still be answered stale.
+RESPONSE_STALE_TTL = int(os.getenv("RESPONSE_STALE_TTL", "86400"))
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS = redis.Redis.from_url(REDIS_URL) if redis and REDIS_URL else None
+_RESPONSE_CACHE: TTLCache = BodyTTLCache(maxsize=RESPONSE_CACHE_BYTES, ttl=RESPONSE_STALE_TTL, getsizeof=body_size)
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    mimetype: str
+    etag: str
+    fresh_until: float
+
+# Metrics for finding the real hot paths: upstream EOG latency and cache outcomes
+if prometheus_client:
+    UPSTREAM_LATENCY = prometheus_client.Histogram(
+        "eog_upstream_request_seconds", "Latency of upstream EOG API calls", ["path"])
+    CACHE_LOOKUPS = prometheus_client.Counter(
+        "cache_lookups_total", "Response and result cache lookups by endpoint and outcome", ["endpoint", "state"])
+    DISCREPANCY_LATENCY = prometheus_client.Histogram(
+        "discrepancy_latency_seconds", "Time to answer /api/discrepancies by cache outcome", ["cache"])
+else:
+    UPSTREAM_LATENCY = CACHE_LOOKUPS = DISCREPANCY_LATENCY = None
+
+def record_cache_state(state: str) -> None:
+    # Remember the cache outcome of the current request (g.cache_state) and count it
+    if not has_request_context():
+        return
+    g.cache_state = state
+    if CACHE_LOOKUPS is not None:
+        CACHE_LOOKUPS.labels(request.endpoint, state).inc()
+
+# Shared keep-alive session so upstream calls reuse pooled connections; transient gateway
+# errors are retried with a short backoff, and dead hosts fail fast on connect
+UPSTREAM_TIMEOUT = (2, 60)  # (connect, read) seconds; /api/Data bodies can be large
+UPSTREAM_RETRY = Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504], raise_on_status=False)
+
+# TCP keepalive on pooled sockets so idle upstream connections survive NAT/LB idle timeouts
+KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, "TCP_KEEPIDLE"):
+    KEEPALIVE_SOCKET_OPTIONS += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60), (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 15)]
+
+class KeepAliveAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+SESSION = requests.Session()
+SESSION.mount("https://", KeepAliveAdapter(pool_connections=16, pool_maxsize=32, max_retries=UPSTREAM_RETRY))
+SESSION.mount("http://", KeepAliveAdapter(pool_connections=16, pool_maxsize=32, max_retries=UPSTREAM_RETRY))
+
+# Opt-in HTTP/2 client (UPSTREAM_HTTP2=1, needs httpx[http2]): concurrent upstream calls are
+# multiplexed over one TLS connection instead of one pooled socket each
+HTTP2_CLIENT = None
+if httpx and os.getenv("UPSTREAM_HTTP2", "").lower() in ("1", "true", "yes"):
+    try:
+        # Pool settings belong on the transport; httpx ignores Client-level ones when one is given
+        HTTP2_CLIENT = httpx.Client(
+            timeout=httpx.Timeout(UPSTREAM_TIMEOUT[1], connect=UPSTREAM_TIMEOUT[0]),
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            ),
+        )
+    except ImportError as exc:  # the h2 extra is missing; stay on the requests session
+        logging.getLogger(__name__).warning("HTTP/2 upstream client unavailable: %s", exc)
+
+UPSTREAM_ERRORS: Tuple[type, ...] = (requests.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+def upstream_request(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None) -> Any:
+    # Both clients return responses with the same status_code/headers/content/raise_for_status surface
+    started = time.perf_counter()
+    try:
+        if HTTP2_CLIENT is not None:
+            return HTTP2_CLIENT.request(method, url, params=params, headers=headers)
+        return SESSION.request(method, url, params=params, headers=headers, timeout=UPSTREAM_TIMEOUT)
+    finally:
+        if UPSTREAM_LATENCY is not None:
+            UPSTREAM_LATENCY.labels(urlsplit(url).path).observe(time.perf_counter() - started)
+
+def warm_upstream() -> None:
+    # Resolve the EOG host and open one pooled connection ahead of the first real request, so
+    # that request pays neither getaddrinfo nor the TLS handshake. Only that first connection is
+    # warmed: each further pooled connection (up to pool_maxsize under concurrent fan-out) still
+    # resolves the host itself, relying on the system resolver's cache
+    try:
+        upstream_request("HEAD", BASE_URL)
+    except UPSTREAM_ERRORS as exc:
+        app.logger.warning("Upstream warm-up failed: %s", exc)
+
+class OrjsonProvider(DefaultJSONProvider):
+    # jsonify via orjson: encodes straight to bytes in C and handles NumPy values natively
+    def _options(self) -> int:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        return options | orjson.OPT_SORT_KEYS if self.sort_keys else options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 # Initialize Flask application with CORS support
 app = Flask(__name__)
-if CORS:
-    CORS(app, resources={r"/*": {"origins": "*"}})
+# Accept paths with or without a trailing slash directly instead of answering with a redirect
+app.url_map.strict_slashes = False
+if orjson:
+    app.json = OrjsonProvider(app)
+
+# Compress JSON bodies above 1 KiB (historical data, discrepancies); level 4 trades a little
+# ratio for much less CPU than the defaults. Streamed relays (see stream_upstream) are not compressed
+app.config.update(
+    COMPRESS_MIMETYPES=["application/json"],
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    COMPRESS_LEVEL=4,
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_MIN_SIZE=1024,
+)
+if Compress:
+    Compress(app)
+
+# Per-endpoint request latency and a /metrics route. Samples are per process unless
+# PROMETHEUS_MULTIPROC_DIR is set, in which case every worker (gunicorn -w, uWSGI processes,
+# uvicorn --workers) writes there and /metrics sums them; see gunicorn.conf.py and uwsgi.ini
+if PrometheusMetrics is None:
+    METRICS = None
+elif os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    METRICS = MultiprocessInternalPrometheusMetrics(app, group_by="endpoint")
+else:
+    METRICS = PrometheusMetrics(app, group_by="endpoint")
+
+# Every route shares one CORS policy, so the headers are fixed at import and simply copied
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": os.getenv("CORS_ORIGIN", "*"),
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+}
+
+@app.after_request
+def add_cors_headers(resp: Response) -> Response:
+    resp.headers.update(CORS_HEADERS)
+    # Preflights are allowed whatever headers they ask for (Authorization, custom headers),
+    # as flask-cors did by echoing Access-Control-Request-Headers
+    requested = request.headers.get("Access-Control-Request-Headers")
+    if request.method == "OPTIONS" and requested:
+        resp.headers["Access-Control-Allow-Headers"] = requested
+        resp.vary.add("Access-Control-Request-Headers")
+    return resp
 
 # ---------------------------------
 # Helper Functions
 # ---------------------------------
-def fetch_json(url: str, params: Optional[Dict[str, Any]] = None) -> Any:
-    r = requests.get(url, params=params, timeout=60)
-    r.raise_for_status()
-    return r.json()
-
-def to_dt(ts: str) -> datetime:
-    return datetime.fromisoformat(ts.replace("Z", "+00:00")).astimezone(timezone.utc)
+def decode_json(body: bytes) -> Any:
+    # Decode the raw body directly; skips requests' charset detection and the stdlib parser
+    return orjson.loads(body) if orjson else json.loads(body)
+
+UpstreamKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+def lookup_upstream(key: UpstreamKey, ttl: int) -> Tuple[Optional[UpstreamEntry], Optional[UpstreamEntry]]:
+    # (fresh entry, None) while key is within its TTL, else (None, last seen entry to revalidate)
+    with _FETCH_LOCK:
+        if key in _FETCH_CACHES[ttl]:
+            return _UPSTREAM_ENTRIES.get(key) or _FETCH_CACHES[ttl][key], None
+        return None, _UPSTREAM_ENTRIES.get(key)
+
+def revalidation_headers(previous: Optional[UpstreamEntry]) -> Optional[Dict[str, str]]:
+    return {"If-None-Match": previous.etag} if previous and previous.etag else None
+
+def remember_upstream(key: UpstreamKey, ttl: int, r: Any, previous: Optional[UpstreamEntry]) -> UpstreamEntry:
+    # Store a requests/httpx response for key; a 304 or an unchanged body keeps the previous entry
+    if r.status_code == 304 and previous:
+        entry = previous
+    else:
+        r.raise_for_status()
+        digest = hashlib.blake2b(r.content, digest_size=16).hexdigest()
+        if previous and previous.digest == digest:
+            entry = previous
+        else:
+            content_type = r.headers.get("Content-Type", "application/json")
+            entry = UpstreamEntry(r.headers.get("ETag"), digest, r.content, content_type)
+    with _FETCH_LOCK:
+        _FETCH_CACHES[ttl][key] = entry
+        _UPSTREAM_ENTRIES[key] = entry
+    return entry
+
+def _cached_fetch(url: str, params_tuple: Tuple[Tuple[str, Any], ...], ttl: int) -> UpstreamEntry:
+    # Serve repeated upstream requests from an in-process TTL cache keyed by (url, params)
+    # On expiry, revalidate with If-None-Match and reuse the previous entry when unchanged
+    key = (url, params_tuple)
+    entry, previous = lookup_upstream(key, ttl)
+    if entry is not None:
+        return entry
+    r = upstream_request("GET", url, params=dict(params_tuple) or None, headers=revalidation_headers(previous))
+    return remember_upstream(key, ttl, r, previous)
+
+def payload_digest(payload: Any) -> Optional[str]:
+    # Digest of the upstream body a cached payload was decoded from, if it is still tracked
+    with _FETCH_LOCK:
+        for entry in _UPSTREAM_ENTRIES.values():
+            if entry.payload is payload:
+                return entry.digest
+    return None
+
+def analyze_history(history: List[Dict[str, Any]]) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], List[Dict[str, Any]]]:
+    # Group and detect drains once per distinct /api/Data body; unchanged data is a dict lookup
+    digest = payload_digest(history)
+    if digest is not None:
+        with _FETCH_LOCK:
+            cached = _ANALYSIS_CACHE.get(digest)
+        if cached is not None:
+            return cached
+    grouped = group_by_cauldron(history)
+    result = (grouped, detect_drains(grouped))
+    if digest is not None:
+        with _FETCH_LOCK:
+            _ANALYSIS_CACHE[digest] = result
+    return result
+
+def fetch_upstream(url: str, params: Optional[Dict[str, Any]] = None) -> UpstreamEntry:
+    params_tuple = tuple(sorted(params.items())) if params else ()
+    return _cached_fetch(url, params_tuple, CACHE_TTLS.get(url, DEFAULT_CACHE_TTL))
 
-def median(vals: List[float]) -> float:
-    if not vals:
-        return 0.0
-    s = sorted(vals)
-    n = len(s)
-    m = n // 2
-    return float(s[m]) if n % 2 else float(0.5 * (s[m - 1] + s[m]))
+def fetch_json(url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    entry = fetch_upstream(url, params)
+    if entry.payload is not None:
+        return entry.payload
+    payload = decode_records(entry.body) if url == ENDPOINTS["data"] else decode_json(entry.body)
+    # Keep the first decoded payload for this body so analysis caching sees a stable object
+    key = (url, tuple(sorted(params.items())) if params else ())
+    with _FETCH_LOCK:
+        current = _UPSTREAM_ENTRIES.get(key)
+        if current is not None and current.digest == entry.digest:
+            if current.payload is not None:
+                return current.payload
+            _UPSTREAM_ENTRIES[key] = current._replace(payload=payload)
+    return payload
+
+def proxy_upstream(url: str, params: Optional[Dict[str, Any]] = None) -> Response:
+    # Forward the upstream body bytes untouched instead of decoding and re-encoding them
+    entry = fetch_upstream(url, params)
+    return Response(entry.body, content_type=entry.content_type)
+
+def stream_upstream(url: str, params: Optional[Dict[str, Any]] = None) -> Response:
+    # Relay a large body chunk by chunk as it arrives rather than buffering it first; once
+    # complete it is teed into the upstream cache. Bodies that are cached or can be
+    # revalidated with an ETag are cheaper to serve from memory, so those go through proxy_upstream.
+    # flask-compress skips direct_passthrough responses, so a relayed body is sent uncompressed;
+    # the cached copy served to later requests is compressed as usual
+    ttl = CACHE_TTLS.get(url, DEFAULT_CACHE_TTL)
+    key = (url, tuple(sorted(params.items())) if params else ())
+    with _FETCH_LOCK:
+        cached = key in _FETCH_CACHES[ttl]
+        previous = _UPSTREAM_ENTRIES.get(key)
+    if cached or (previous and previous.etag) or HTTP2_CLIENT is not None:
+        return proxy_upstream(url, params)
+    started = time.perf_counter()
+    r = SESSION.get(url, params=params, stream=True, timeout=UPSTREAM_TIMEOUT)
+    try:
+        r.raise_for_status()
+    except requests.HTTPError:
+        r.close()
+        raise
+    content_type = r.headers.get("Content-Type", "application/json")
+
+    def relay():
+        parts = []
+        with r:
+            for chunk in r.iter_content(chunk_size=65536):
+                parts.append(chunk)
+                yield chunk
+        # Observed once the whole body has arrived, like every other upstream call
+        if UPSTREAM_LATENCY is not None:
+            UPSTREAM_LATENCY.labels(urlsplit(url).path).observe(time.perf_counter() - started)
+        body = b"".join(parts)
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with _FETCH_LOCK:
+            current = _UPSTREAM_ENTRIES.get(key)
+            entry = current if current and current.digest == digest else \
+                UpstreamEntry(r.headers.get("ETag"), digest, body, content_type)
+            _FETCH_CACHES[ttl][key] = entry
+            _UPSTREAM_ENTRIES[key] = entry
+
+    resp = Response(relay(), content_type=content_type, direct_passthrough=True)
+    # A body that is never iterated (HEAD, or a client gone before the first chunk) still
+    # returns its connection to the pool
+    resp.call_on_close(r.close)
+    return resp
+
+def fetch_json_many(jobs: Dict[str, Tuple[str, Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+    # Fetch {key: (url, params)} concurrently so wall time is the slowest call, not the sum
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {key: pool.submit(fetch_json, url, params) for key, (url, params) in jobs.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+def body_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def _cached_body_response(entry: CachedResponse, state: str) -> Response:
+    resp = Response(entry.body, mimetype=entry.mimetype, headers={"X-Cache": state})
+    resp.set_etag(entry.etag)
+    return resp
+
+def load_response(key: str) -> Optional[CachedResponse]:
+    if REDIS is None:
+        with _FETCH_LOCK:
+            return _RESPONSE_CACHE.get(key)
+    try:
+        fields = REDIS.hgetall(key)
+    except redis.RedisError as exc:
+        app.logger.warning("Response cache read failed for %s: %s", key, exc)
+        return None
+    if not fields:
+        return None
+    body = fields[b"body"]
+    etag = fields[b"etag"].decode() if b"etag" in fields else body_etag(body)
+    return CachedResponse(body, fields[b"mimetype"].decode(), etag, float(fields[b"fresh_until"]))
+
+def store_response(key: str, entry: CachedResponse) -> None:
+    if REDIS is None:
+        with _FETCH_LOCK:
+            _RESPONSE_CACHE[key] = entry
+        return
+    try:
+        pipe = REDIS.pipeline()
+        pipe.hset(key, mapping={
+            "body": entry.body,
+            "mimetype": entry.mimetype,
+            "etag": entry.etag,
+            "fresh_until": entry.fresh_until,
+        })
+        pipe.expire(key, RESPONSE_STALE_TTL)
+        pipe.execute()
+    except redis.RedisError as exc:
+        app.logger.warning("Response cache write failed for %s: %s", key, exc)
+
+def range_params() -> Dict[str, int]:
+    # The start_date/end_date window of a ranged route, normalized to ints with the API defaults
+    return {
+        "start_date": int(request.args.get("start_date", 0)),
+        "end_date": int(request.args.get("end_date", 2_000_000_000)),
+    }
+
+def response_key(rule: str, params: Optional[Dict[str, int]] = None) -> str:
+    # Response cache key for a route, plus its normalized date range when it is ranged
+    if params is None:
+        return f"potion-guard:response:{rule}"
+    return f"potion-guard:response:{rule}?start_date={params['start_date']}&end_date={params['end_date']}"
+
+def cached_response(ttl: int, ranged: bool = False):
+    # Cache a read-through view's rendered body per route (and normalized date range) for `ttl`
+    # seconds; hits skip the upstream call and re-serialization, upstream errors fall back to the
+    # stale body. Other query arguments are ignored by the views, so they are left out of the key.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = response_key(request.url_rule.rule, range_params() if ranged else None)
+            entry = load_response(key)
+            if entry is not None and entry.fresh_until > time.time():
+                record_cache_state("hit")
+                return _cached_body_response(entry, "HIT")
+            try:
+                resp = make_response(view(*args, **kwargs))
+            except UPSTREAM_ERRORS as exc:
+                if entry is None:
+                    raise
+                app.logger.warning("Upstream failed for %s, serving stale response: %s", request.path, exc)
+                record_cache_state("stale")
+                return _cached_body_response(entry, "STALE")
+            # Streamed bodies are buffered once, by stream_upstream into the upstream cache; the
+            # next request is answered from there and cached here without another copy
+            if resp.status_code == 200 and not resp.is_streamed:
+                body = resp.get_data()
+                etag = body_etag(body)
+                store_response(key, CachedResponse(body, resp.mimetype, etag, time.time() + ttl))
+                resp.set_etag(etag)
+            record_cache_state("miss")
+            resp.headers["X-Cache"] = "MISS"
+            return resp
+        return wrapper
+    return decorator
+
+def single_flight(cache: TTLCache, key: Any, compute) -> Any:
+    # Return cache[key], computing it at most once per miss; concurrent callers for the same
+    # key wait on the first caller's Future instead of repeating the work
+    with _FETCH_LOCK:
+        if key in cache:
+            record_cache_state("hit")
+            return cache[key]
+        future = _INFLIGHT.get(key)
+        owner = future is None
+        if owner:
+            future = _INFLIGHT[key] = Future()
+    if not owner:
+        record_cache_state("shared")
+        return future.result()
+    record_cache_state("miss")
+    try:
+        value = compute()
+    except BaseException as exc:
+        # Waiters must never be left blocked, even on gevent Timeout/GreenletExit
+        future.set_exception(exc)
+        raise
+    else:
+        with _FETCH_LOCK:
+            cache[key] = value
+        future.set_result(value)
+        return value
+    finally:
+        with _FETCH_LOCK:
+            _INFLIGHT.pop(key, None)
+
+def http_cached(max_age: int):
+    # Tag successful responses with an ETag (reusing the cached body's when present) and
+    # Cache-Control; a matching If-None-Match gets an empty 304 instead of the body
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+            if "ETag" not in resp.headers and not resp.is_streamed:
+                resp.set_etag(body_etag(resp.get_data()))
+            resp.cache_control.public = True
+            resp.cache_control.max_age = max_age
+            return resp.make_conditional(request)
+        return wrapper
+    return decorator
+
+def cauldron_names(cauldrons: List[Dict[str, Any]]) -> Dict[str, str]:
+    return {c["id"]: c.get("name", c["id"]) for c in cauldrons}
+
+@lru_cache(maxsize=8)
+def shortest_travel_times(edges: Tuple[Tuple[str, str, float], ...]) -> Tuple[Dict[str, int], np.ndarray]:
+    # Floyd-Warshall over the (small) network; cached per distinct edge list
+    nodes = sorted({a for a, _, _ in edges} | {b for _, b, _ in edges})
+    index = {node: i for i, node in enumerate(nodes)}
+    dist = np.full((len(nodes), len(nodes)), np.inf)
+    np.fill_diagonal(dist, 0.0)
+    for a, b, t in edges:
+        i, j = index[a], index[b]
+        dist[i, j] = dist[j, i] = min(dist[i, j], t)
+    for k in range(len(nodes)):
+        dist = np.minimum(dist, dist[:, k, None] + dist[None, k, :])
+    return index, dist
 
 # ---------------------------------
 # Root and Health Check Endpoints
 # ---------------------------------
+# Static bodies are encoded once at import; the handlers only wrap the prebuilt bytes
+ROOT_BODY = json.dumps({
+    "ok": True,
+    "message": "CauldronWatch backend is running",
+    # The fallback detector is gone; the key stays for existing consumers of /
+    "using_fallback_detector": False,
+    "endpoints": [
+        "/health",
+        # legacy (kept):
+        "/data?start_date=0&end_date=2000000000",
+        "/tickets",
+        "/cauldrons",
+        "/market",
+        "/network",
+        "/drains?start_date=0&end_date=2000000000",
+        "/matches?start_date=0&end_date=2000000000",
+        "/bootstrap?start_date=0&end_date=2000000000",
+        # required new API:
+        "/api/cauldrons",
+        "/api/tickets",
+        "/api/historical-data?start_date=0&end_date=2000000000",
+        # bonus:
+        "/api/forecast",
+        "/api/optimized-routes"
+    ]
+}, separators=(",", ":")).encode()
+HEALTH_BODY = b'{"ok":true}'
+
 @app.route("/", methods=["GET"])
 def root():
-    return jsonify({
-        "ok": True,
-        "message": "CauldronWatch backend is running",
-        "using_fallback_detector": USING_FALLBACK,
-        "endpoints": [
-            "/health",
-            # legacy (kept):
-            "/data?start_date=0&end_date=2000000000",
-            "/tickets",
-            "/cauldrons",
-            "/market",
-            "/network",
-            "/drains?start_date=0&end_date=2000000000",
-            "/matches?start_date=0&end_date=2000000000",
-            "/bootstrap?start_date=0&end_date=2000000000",
-            # required new API:
-            "/api/cauldrons",
-            "/api/tickets",
-            "/api/historical-data?start_date=0&end_date=2000000000",
-            # bonus:
-            "/api/forecast",
-            "/api/optimized-routes"
-        ]
-    })
+    return Response(ROOT_BODY, mimetype="application/json")
 
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"ok": True})
-
-# ---------------------------------
-# Legacy Proxy Endpoints (for backward compatibility)
-# ---------------------------------
-@app.route("/data", methods=["GET"])
-def data_proxy_legacy():
-    start = int(request.args.get("start_date", 0))
-    end = int(request.args.get("end_date", 2_000_000_000))
-    payload = fetch_json(ENDPOINTS["data"], params={"start_date": start, "end_date": end})
-    return jsonify(payload)
-
-@app.route("/tickets", methods=["GET"])
-def tickets_proxy_legacy():
-    return jsonify(fetch_json(ENDPOINTS["tickets"]))
-
-@app.route("/cauldrons", methods=["GET"])
-def cauldrons_proxy_legacy():
-    return jsonify(fetch_json(ENDPOINTS["cauldrons"]))
-
-@app.route("/market", methods=["GET"])
-def market_proxy():
-    return jsonify(fetch_json(ENDPOINTS["market"]))
-
-@app.route("/network", methods=["GET"])
-def network_proxy():
-    return jsonify(fetch_json(ENDPOINTS["network"]))
+    return Response(HEALTH_BODY, mimetype="application/json")
 
 # ---------------------------------
-# Main API Pass-Through Endpoints
-# Proxy requests to EOG API with /api prefix
+# Pass-Through Endpoints
+# Proxy requests to the EOG API; the /api routes are the main API, the bare ones are
+# kept for backward compatibility
 # ---------------------------------
-@app.route("/api/cauldrons", methods=["GET"])
-def api_cauldrons():
-    return jsonify(fetch_json(ENDPOINTS["cauldrons"]))
-
-@app.route("/api/tickets", methods=["GET"])
-def api_tickets():
-    return jsonify(fetch_json(ENDPOINTS["tickets"]))
+class PassThrough(NamedTuple):
+    endpoint: str                 # Flask endpoint name
+    upstream: str                 # ENDPOINTS key
+    ttl: Optional[int] = None     # response cache TTL (seconds), None to always proxy
+    max_age: Optional[int] = None # browser Cache-Control max-age with ETag/304, None to omit
+    ranged: bool = False          # forwards start_date/end_date
+    stream: bool = False          # relay uncached bodies as they arrive (see stream_upstream)
+
+PASS_THROUGHS = {
+    # legacy (kept):
+    "/data": PassThrough("data_proxy_legacy", "data", ttl=60, ranged=True, stream=True),
+    "/tickets": PassThrough("tickets_proxy_legacy", "tickets", ttl=30),
+    "/cauldrons": PassThrough("cauldrons_proxy_legacy", "cauldrons", ttl=300),
+    "/market": PassThrough("market_proxy", "market"),
+    "/network": PassThrough("network_proxy", "network"),
+    # main API:
+    "/api/cauldrons": PassThrough("api_cauldrons", "cauldrons", ttl=300, max_age=300),
+    "/api/tickets": PassThrough("api_tickets", "tickets", ttl=30),
+    "/api/historical-data": PassThrough("api_historical_data", "data", ttl=60, max_age=60, ranged=True,
+                                        stream=True),
+}
 
-@app.route("/api/historical-data", methods=["GET"])
-def api_historical_data():
-    start = int(request.args.get("start_date", 0))
-    end = int(request.args.get("end_date", 2_000_000_000))
-    payload = fetch_json(ENDPOINTS["data"], params={"start_date": start, "end_date": end})
-    return jsonify(payload)
+def make_pass_through(spec: PassThrough):
+    def view():
+        params = range_params() if spec.ranged else None
+        relay = stream_upstream if spec.stream else proxy_upstream
+        return relay(ENDPOINTS[spec.upstream], params=params)
+    view.__name__ = spec.endpoint
+    if spec.ttl is not None:
+        view = cached_response(ttl=spec.ttl, ranged=spec.ranged)(view)
+    if spec.max_age is not None:
+        view = http_cached(max_age=spec.max_age)(view)
+    return view
+
+for path, spec in PASS_THROUGHS.items():
+    app.add_url_rule(path, spec.endpoint, make_pass_through(spec), methods=["GET"])
 
 # ---------------------------------
 # Computed Data Endpoints
@@ -164,7 +692,7 @@ def drains_endpoint():
     start = int(request.args.get("start_date", 0))
     end = int(request.args.get("end_date", 2_000_000_000))
     records = fetch_json(ENDPOINTS["data"], params={"start_date": start, "end_date": end})
-    drains = detect_all_drains_from_records(records)
+    _, drains = analyze_history(records)
     return jsonify({"drains": drains})
 
 @app.route("/matches", methods=["GET"])
@@ -175,11 +703,15 @@ def matches_endpoint():
     eps_abs = float(request.args.get("eps_abs", 5.0))
     dummy_penalty = float(request.args.get("dummy_penalty", 50.0))
 
-    records = fetch_json(ENDPOINTS["data"], params={"start_date": start, "end_date": end})
-    drains = detect_all_drains_from_records(records)
-    tickets_payload = fetch_json(ENDPOINTS["tickets"])
-    tickets = tickets_payload.get("transport_tickets", [])
-    matches = match_tickets(drains, tickets, eps_pct=eps_pct, eps_abs=eps_abs, dummy_penalty=dummy_penalty)
+    fetched = fetch_json_many({
+        "records": (ENDPOINTS["data"], {"start_date": start, "end_date": end}),
+        "tickets": (ENDPOINTS["tickets"], None),
+        "cauldrons": (ENDPOINTS["cauldrons"], None),
+    })
+    _, drains = analyze_history(fetched["records"])
+    tickets = fetched["tickets"].get("transport_tickets", [])
+    matches = match_tickets(drains, tickets, eps_pct=eps_pct, eps_abs=eps_abs, dummy_penalty=dummy_penalty,
+                            cauldron_info=cauldron_names(fetched["cauldrons"]))
     return jsonify({"matches": matches})
 
 @app.route("/api/discrepancies", methods=["GET"])
@@ -188,45 +720,96 @@ def api_discrepancies():
     Faaiz's main discrepancy detection endpoint.
     Returns a clean list of discrepancies for the frontend to display.
     """
+    started = time.perf_counter()
     start = int(request.args.get("start_date", 0))
     end = int(request.args.get("end_date", 2_000_000_000))
-    
+    snapshot = _DISCREPANCY_SNAPSHOT
+    if (start, end) == DEFAULT_RANGE and snapshot is not None \
+            and time.time() - snapshot.taken_at < 3 * DISCREPANCY_REFRESH_SECONDS:
+        record_cache_state("snapshot")
+        resp = Response(snapshot.body, mimetype="application/json")
+    else:
+        resp = jsonify(discrepancies_for(start, end))
+    if DISCREPANCY_LATENCY is not None:
+        DISCREPANCY_LATENCY.labels(g.cache_state).observe(time.perf_counter() - started)
+    return resp
+
+def jobs_unavailable() -> Tuple[Response, int]:
+    # Without Celery or Redis a job is only visible to the worker that accepted it
+    return jsonify({"error": "job queue not configured: set CELERY_BROKER_URL or REDIS_URL "
+                             "(or JOBS_IN_PROCESS=1 for a single process)"}), 503
+
+@app.route("/api/discrepancies/jobs", methods=["POST"])
+def api_discrepancy_jobs():
+    """
+    Queues the discrepancy analysis instead of running it inside the request.
+    Input JSON (optional): {"start_date": 0, "end_date": 2000000000}
+
+    Returns 202 with {task_id, status_url}; poll status_url for the result.
+    Returns 503 when no job backend is configured or too many jobs are pending.
+    """
+    if not tasks.available():
+        return jobs_unavailable()
+    body = request.get_json(silent=True) or {}
+    start = int(body.get("start_date", 0))
+    end = int(body.get("end_date", 2_000_000_000))
+    try:
+        task_id = tasks.submit_discrepancies(start, end)
+    except tasks.JobQueueFull as exc:
+        return jsonify({"error": str(exc)}), 503, {"Retry-After": "5"}
+    status_url = url_for("api_discrepancy_job", task_id=task_id)
+    return jsonify({"task_id": task_id, "status_url": status_url}), 202, {"Location": status_url}
+
+@app.route("/api/discrepancies/jobs/<task_id>", methods=["GET"])
+def api_discrepancy_job(task_id: str):
+    """
+    Returns: {state: PENDING|STARTED|SUCCESS|FAILURE, result?: [...], error?: "..."}
+    """
+    if not tasks.available():
+        return jobs_unavailable()
+    status = tasks.job_status(task_id)
+    if status is None:
+        return jsonify({"error": "unknown task id"}), 404
+    return jsonify({"task_id": task_id, **status})
+
+def discrepancies_for(start: int, end: int) -> List[Dict[str, Any]]:
+    # Per-range discrepancies from the TTL cache; concurrent misses share one computation
+    return single_flight(_DISCREPANCY_CACHE, ("discrepancies", start, end),
+                         lambda: compute_discrepancies(start, end))
+
+def compute_discrepancies(start: int, end: int) -> List[Dict[str, Any]]:
     # Fetch the data
-    records = fetch_json(ENDPOINTS["data"], params={"start_date": start, "end_date": end})
-    tickets_payload = fetch_json(ENDPOINTS["tickets"])
+    fetched = fetch_json_many({
+        "records": (ENDPOINTS["data"], {"start_date": start, "end_date": end}),
+        "tickets": (ENDPOINTS["tickets"], None),
+        "cauldrons": (ENDPOINTS["cauldrons"], None),
+    })
     
     # Run Faaiz's analysis
-    drains = detect_all_drains_from_records(records)
-    discrepancies = match_tickets(drains, tickets_payload)
-    
-    return jsonify(discrepancies)
+    _, drains = analyze_history(fetched["records"])
+    return match_tickets(drains, fetched["tickets"], cauldron_info=cauldron_names(fetched["cauldrons"]))
 
 @app.route("/bootstrap", methods=["GET"])
 def bootstrap():
     start = int(request.args.get("start_date", 0))
     end = int(request.args.get("end_date", 2_000_000_000))
 
-    cauldrons = fetch_json(ENDPOINTS["cauldrons"])
-    market = fetch_json(ENDPOINTS["market"])
-    tickets_payload = fetch_json(ENDPOINTS["tickets"])
-    tickets = tickets_payload.get("transport_tickets", [])
-    history = fetch_json(ENDPOINTS["data"], params={"start_date": start, "end_date": end})
-
-    # latest snapshot
-    latest_ts = None
-    latest_by_cid: Dict[str, Dict[str, float]] = {}
-    seen_ts: Dict[str, datetime] = {}
-    for rec in history:
-        ts = to_dt(rec["timestamp"])
-        if latest_ts is None or ts > latest_ts:
-            latest_ts = ts
-        for cid, vol in rec.get("cauldron_levels", {}).items():
-            if cid not in seen_ts or ts >= seen_ts[cid]:
-                seen_ts[cid] = ts
-                latest_by_cid[cid] = {"volume": float(vol)}
-
-    drains = detect_all_drains_from_records(history)
-    matches = match_tickets(drains, tickets)
+    fetched = fetch_json_many({
+        "cauldrons": (ENDPOINTS["cauldrons"], None),
+        "market": (ENDPOINTS["market"], None),
+        "tickets": (ENDPOINTS["tickets"], None),
+        "history": (ENDPOINTS["data"], {"start_date": start, "end_date": end}),
+    })
+    cauldrons = fetched["cauldrons"]
+    market = fetched["market"]
+    tickets = fetched["tickets"].get("transport_tickets", [])
+    history = fetched["history"]
+
+    # Parse the history once; series are sorted, so the latest snapshot is each last sample
+    grouped, drains = analyze_history(history)
+    latest_by_cid = {cid: {"volume": float(lvl[-1])} for cid, (ts, lvl) in grouped.items()}
+    latest_ts = from_epoch_ns(max(int(ts[-1]) for ts, _ in grouped.values())) if grouped else None
+    matches = match_tickets(drains, tickets, cauldron_info=cauldron_names(cauldrons))
 
     return jsonify({
         "latest_ts": latest_ts.isoformat() if latest_ts else None,
@@ -241,6 +824,7 @@ def bootstrap():
 # Overflow Forecasting Endpoint
 # ---------------------------------
 @app.route("/api/forecast", methods=["GET"])
+@http_cached(max_age=30)
 def api_forecast():
     """
     Predicts when each cauldron will reach capacity using EWMA fill rate estimation.
@@ -254,32 +838,28 @@ def api_forecast():
     # pull a bit more history to compute slopes
     start = int(request.args.get("start_date", max(0, end - window_minutes * 120)))  # heuristic
 
-    cauldrons = fetch_json(ENDPOINTS["cauldrons"])
+    fetched = fetch_json_many({
+        "cauldrons": (ENDPOINTS["cauldrons"], None),
+        "history": (ENDPOINTS["data"], {"start_date": start, "end_date": end}),
+    })
+    cauldrons = fetched["cauldrons"]
     cap_by = {c["id"]: float(c.get("max_volume") or 0.0) for c in cauldrons}
-    history = fetch_json(ENDPOINTS["data"], params={"start_date": start, "end_date": end})
-
-    # Build time series data for each cauldron
-    series: Dict[str, List[Tuple[datetime, float]]] = {}
-    for rec in history:
-        ts = to_dt(rec["timestamp"])
-        for cid, vol in rec.get("cauldron_levels", {}).items():
-            series.setdefault(cid, []).append((ts, float(vol)))
-    
+    history = fetched["history"]
+
     # Calculate fill rate using EWMA and predict overflow time
     out: List[Dict[str, Any]] = []
-    for cid, rows in series.items():
-        rows.sort(key=lambda t: t[0])
-        if len(rows) < 2:
+    for cid, (ts, lvl) in group_by_cauldron(history).items():
+        if len(lvl) < 2:
             continue
-        r_fill = 0.0
-        have = False
-        for i in range(1, len(rows)):
-            dtm = max(1e-6, (rows[i][0] - rows[i-1][0]).total_seconds() / 60.0)
-            slope = (rows[i][1] - rows[i-1][1]) / dtm
-            if slope > 0:
-                r_fill = alpha * slope + (1 - alpha) * r_fill
-                have = True
-        current_level = rows[-1][1]
+        dtm = np.maximum(np.diff(ts) / NS_PER_MINUTE, 1e-6)
+        slopes = np.diff(lvl) / dtm
+        rising = slopes[slopes > 0]
+        have = rising.size > 0
+        # EWMA over rising slopes starting from 0 collapses to a weighted sum:
+        # r_n = sum_k alpha * (1 - alpha)^(n-1-k) * slope_k
+        weights = alpha * (1 - alpha) ** np.arange(rising.size - 1, -1, -1)
+        r_fill = float(weights @ rising) if have else 0.0
+        current_level = float(lvl[-1])
         capacity = cap_by.get(cid, 0.0)
         if capacity <= 0:
             continue
@@ -323,36 +903,41 @@ def api_optimized_routes():
     witches = int(body.get("witches", 1))
     unload_minutes = int(body.get("unload_minutes", 15))
 
-    cauldrons = fetch_json(ENDPOINTS["cauldrons"])
-    network = fetch_json(ENDPOINTS["network"])
-    market = fetch_json(ENDPOINTS["market"])
-    # latest snapshot
-    history = fetch_json(ENDPOINTS["data"], params={"start_date": 0, "end_date": 2_000_000_000})
+    fetched = fetch_json_many({
+        "cauldrons": (ENDPOINTS["cauldrons"], None),
+        "network": (ENDPOINTS["network"], None),
+        "market": (ENDPOINTS["market"], None),
+        # latest snapshot
+        "history": (ENDPOINTS["data"], {"start_date": 0, "end_date": 2_000_000_000}),
+    })
+    cauldrons = fetched["cauldrons"]
+    network = fetched["network"]
+    market = fetched["market"]
+    history = fetched["history"]
 
-    # Determine latest level for each cauldron
-    latest_by: Dict[str, Tuple[datetime, float]] = {}
-    for rec in history:
-        ts = to_dt(rec["timestamp"])
-        for cid, vol in rec.get("cauldron_levels", {}).items():
-            if cid not in latest_by or ts >= latest_by[cid][0]:
-                latest_by[cid] = (ts, float(vol))
+    # Determine latest level for each cauldron (last sample of each sorted series)
+    latest_by = {cid: float(lvl[-1]) for cid, (_, lvl) in group_by_cauldron(history).items()}
 
     # Prioritize cauldrons by fullness (descending order)
     caps = {c["id"]: float(c.get("max_volume") or 1.0) for c in cauldrons}
     targets = sorted(
-        [{"cauldron_id": c["id"], "pct": (latest_by.get(c["id"], (None, 0.0))[1] / max(caps[c["id"]], 1.0))} for c in cauldrons],
+        [{"cauldron_id": c["id"], "pct": (latest_by.get(c["id"], 0.0) / max(caps[c["id"]], 1.0))} for c in cauldrons],
         key=lambda r: r["pct"],
         reverse=True
     )
 
-    # Build travel time lookup table (bidirectional)
-    travel: Dict[Tuple[str, str], float] = {}
-    for e in network.get("edges", []):
-        a, b = e.get("from"), e.get("to")
-        t = float(e.get("travel_time_minutes") or 0.0)
-        if a and b:
-            travel[(a, b)] = t
-            travel[(b, a)] = t
+    # Shortest travel times between every pair of nodes (bidirectional edges)
+    edges = tuple(
+        (e["from"], e["to"], float(e.get("travel_time_minutes") or 0.0))
+        for e in network.get("edges", [])
+        if e.get("from") and e.get("to")
+    )
+    node_index, travel = shortest_travel_times(edges)
+
+    def travel_minutes(a: str, b: str) -> float:
+        i, j = node_index.get(a), node_index.get(b)
+        t = travel[i, j] if i is not None and j is not None else math.inf
+        return float(t) if math.isfinite(t) else 10.0  # default 10 min if unreachable
 
     # Generate star routes from market to fullest cauldrons
     market_id = market.get("id", "market")
@@ -362,10 +947,10 @@ def api_optimized_routes():
     here = market_id
     for i in range(topN):
         cid = targets[i]["cauldron_id"]
-        t_travel = travel.get((here, cid), 10.0)  # default 10 min if edge missing
+        t_travel = travel_minutes(here, cid)
         eta_arrive = now + timedelta(minutes=t_travel)
         # Visit cauldron to drain, then return to market and unload
-        t_back = travel.get((cid, market_id), 10.0)
+        t_back = travel_minutes(cid, market_id)
         eta_unload = eta_arrive + timedelta(minutes=t_back + unload_minutes)
         stops.append({"from": here, "to": cid, "depart": now.isoformat(), "arrive": eta_arrive.isoformat()})
         stops.append({"from": cid, "to": market_id, "depart": eta_arrive.isoformat(), "arrive": (eta_arrive + timedelta(minutes=t_back)).isoformat(), "unload_minutes": unload_minutes})
@@ -380,7 +965,40 @@ def api_optimized_routes():
     })
 
 # ---------------------------------
-# Development Server Entry Point
+# Background Refresh
 # ---------------------------------
-if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5001")), debug=True)
+def refresh_discrepancies_forever() -> None:
+    # Recompute the default-range discrepancies on a fixed interval; /api/discrepancies serves
+    # the encoded snapshot while it is fresh (a stalled refresher falls back to on-demand work)
+    global _DISCREPANCY_SNAPSHOT
+    while True:
+        started = time.time()
+        try:
+            body = app.json.response(compute_discrepancies(*DEFAULT_RANGE)).get_data()
+            _DISCREPANCY_SNAPSHOT = Snapshot(body, time.time())
+        except Exception:
+            app.logger.exception("Background discrepancy refresh failed")
+        time.sleep(max(0.0, DISCREPANCY_REFRESH_SECONDS - (time.time() - started)))
+
+_BACKGROUND_PID: Optional[int] = None
+_BACKGROUND_LOCK = threading.Lock()
+
+def start_background_threads() -> None:
+    # Start this process's background threads, once per process. Threads do not survive fork
+    # (and one holding _FETCH_LOCK at fork time would leave it held in every child), so servers
+    # that load the app before forking call this in each worker: see wsgi.py and gunicorn.conf.py
+    global _BACKGROUND_PID
+    with _BACKGROUND_LOCK:
+        if _BACKGROUND_PID == os.getpid():
+            return
+        _BACKGROUND_PID = os.getpid()
+    # The warm-up's pooled socket must belong to this worker, not be inherited from a parent
+    if os.getenv("UPSTREAM_WARMUP", "").lower() in ("1", "true", "yes"):
+        threading.Thread(target=warm_upstream, name="upstream-warmup", daemon=True).start()
+    if DISCREPANCY_REFRESH_SECONDS > 0:
+        threading.Thread(target=refresh_discrepancies_forever, name="discrepancy-refresh", daemon=True).start()
+
+# wsgi.py sets BACKGROUND_THREADS=postfork and starts them itself; flask run and asgi.py
+# import the app in the serving process, so starting here is safe
+if os.getenv("BACKGROUND_THREADS") != "postfork":
+    start_background_threads()
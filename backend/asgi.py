@@ -0,0 +1,196 @@
+"""
+ASGI entry point for async servers.
+
+    uvicorn asgi:app --workers 4 --loop uvloop
+
+The pass-through routes are served natively here: each upstream call is awaited on a
+shared httpx.AsyncClient, so one process can hold many in-flight EOG requests without
+gevent. They share the Flask app's upstream entries (with ETag revalidation) and its
+response cache, so both paths see the same bodies. Every other route is handed to the
+Flask app through a WSGI bridge.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from a2wsgi import WSGIMiddleware
+from cachetools import LRUCache
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from app import (
+    CACHE_LOOKUPS,
+    CACHE_TTLS,
+    CORS_HEADERS,
+    DEFAULT_CACHE_TTL,
+    ENDPOINTS,
+    PASS_THROUGHS,
+    REDIS,
+    UPSTREAM_LATENCY,
+    UPSTREAM_TIMEOUT,
+    CachedResponse,
+    PassThrough,
+    UpstreamEntry,
+    app as flask_app,
+    load_response,
+    lookup_upstream,
+    remember_upstream,
+    response_key,
+    revalidation_headers,
+    store_response,
+)
+
+# Threads available to the Flask app for blocking routes (analysis, fan-out fetches)
+WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "300"))
+
+CLIENT: Optional[httpx.AsyncClient] = None
+
+# Pass-through bodies are gzipped here, at the flask-compress settings (1 KiB minimum, level 4);
+# the compressed copy (up to 16 MiB in all) is kept per ETag so repeats skip compression
+GZIP_MIN_SIZE = 1024
+_GZIPPED: LRUCache = LRUCache(maxsize=16 * 2**20, getsizeof=len)
+
+@asynccontextmanager
+async def lifespan(_: Starlette):
+    global CLIENT
+    http2 = os.getenv("UPSTREAM_HTTP2", "").lower() in ("1", "true", "yes")
+    # Pool settings belong on the transport; httpx ignores Client-level ones when one is given
+    CLIENT = httpx.AsyncClient(
+        timeout=httpx.Timeout(UPSTREAM_TIMEOUT[1], connect=UPSTREAM_TIMEOUT[0]),
+        transport=httpx.AsyncHTTPTransport(
+            http2=http2,
+            retries=2,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+        ),
+    )
+    async with CLIENT:
+        yield
+
+def etag_matches(request: Request, etag: str) -> bool:
+    return any(tag.strip() in (etag, "*") for tag in request.headers.get("if-none-match", "").split(","))
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, param = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            param = param.strip()
+            try:
+                return not param.startswith("q=") or float(param[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+def preflight(request: Request) -> Response:
+    # CORS preflight, answered like app.add_cors_headers: requested headers are echoed back
+    headers = dict(CORS_HEADERS)
+    requested = request.headers.get("access-control-request-headers")
+    if requested:
+        headers["Access-Control-Allow-Headers"] = requested
+        headers["Vary"] = "Access-Control-Request-Headers"
+    return Response(headers={**headers, "Allow": "GET, HEAD, OPTIONS"})
+
+async def gzipped(body: bytes, etag: str) -> bytes:
+    compressed = _GZIPPED.get(etag)
+    if compressed is None:
+        compressed = await run_in_threadpool(gzip.compress, body, 4)
+        if len(compressed) <= _GZIPPED.maxsize:
+            _GZIPPED[etag] = compressed
+    return compressed
+
+async def off_loop(fn: Callable[..., Any], *args: Any) -> Any:
+    # Redis calls block, so they run on the threadpool; in-process cache lookups run inline
+    return await run_in_threadpool(fn, *args) if REDIS is not None else fn(*args)
+
+def make_async_pass_through(path: str, spec: PassThrough):
+    url = ENDPOINTS[spec.upstream]
+    ttl = CACHE_TTLS.get(url, DEFAULT_CACHE_TTL)
+    latency = UPSTREAM_LATENCY.labels(urlsplit(url).path) if UPSTREAM_LATENCY is not None else None
+    lookups = {state: CACHE_LOOKUPS.labels(spec.endpoint, state) for state in ("hit", "miss", "stale")} \
+        if CACHE_LOOKUPS is not None else None
+
+    async def fetch(params: Optional[Dict[str, Any]]) -> UpstreamEntry:
+        # The async twin of app._cached_fetch
+        key = (url, tuple(sorted(params.items())) if params else ())
+        entry, previous = lookup_upstream(key, ttl)
+        if entry is None:
+            started = time.perf_counter()
+            r = await CLIENT.get(url, params=params, headers=revalidation_headers(previous))
+            if latency is not None:
+                latency.observe(time.perf_counter() - started)
+            entry = remember_upstream(key, ttl, r, previous)
+        return entry
+
+    async def respond(request: Request, body: bytes, mimetype: str, etag: str, state: Optional[str]) -> Response:
+        headers = dict(CORS_HEADERS)
+        if state is not None:
+            headers["X-Cache"] = state
+            if lookups is not None:
+                lookups[state.lower()].inc()
+        encoding = None
+        if len(body) >= GZIP_MIN_SIZE:
+            headers["Vary"] = "Accept-Encoding"
+            if accepts_gzip(request):
+                # Each encoding is a different representation, so it gets its own strong
+                # ETag ("<digest>:gzip", as flask-compress does)
+                encoding = "gzip"
+                etag = f"{etag}:gzip"
+        if spec.ttl is not None or spec.max_age is not None:
+            headers["ETag"] = f'"{etag}"'
+        if spec.max_age is not None:
+            headers["Cache-Control"] = f"public, max-age={spec.max_age}"
+            if etag_matches(request, headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            body = await gzipped(body, etag)
+        return Response(body, headers=headers, media_type=mimetype)
+
+    async def view(request: Request) -> Response:
+        if request.method == "OPTIONS":
+            return preflight(request)
+        params: Optional[Dict[str, Any]] = None
+        if spec.ranged:
+            params = {
+                "start_date": int(request.query_params.get("start_date", 0)),
+                "end_date": int(request.query_params.get("end_date", 2_000_000_000)),
+            }
+        if spec.ttl is None:
+            entry = await fetch(params)
+            return await respond(request, entry.body, entry.content_type, entry.digest, None)
+        # Same flow as app.cached_response: fresh hit, else fetch, else serve stale on error
+        key = response_key(path, params)
+        cached = await off_loop(load_response, key)
+        if cached is not None and cached.fresh_until > time.time():
+            return await respond(request, cached.body, cached.mimetype, cached.etag, "HIT")
+        try:
+            entry = await fetch(params)
+        except httpx.HTTPError:
+            if cached is None:
+                raise
+            return await respond(request, cached.body, cached.mimetype, cached.etag, "STALE")
+        mimetype = entry.content_type.partition(";")[0].strip()
+        etag = entry.digest
+        await off_loop(store_response, key, CachedResponse(entry.body, mimetype, etag, time.time() + spec.ttl))
+        return await respond(request, entry.body, mimetype, etag, "MISS")
+
+    return view
+
+app = Starlette(
+    routes=[
+        *(Route(path, make_async_pass_through(path, spec), methods=["GET", "OPTIONS"], name=spec.endpoint)
+          for path, spec in PASS_THROUGHS.items()),
+        Mount("/", WSGIMiddleware(flask_app, workers=WSGI_THREADS)),
+    ],
+    # No GZipMiddleware: it would also gzip the mounted Flask responses, which flask-compress
+    # already handles (with its size threshold); the pass-throughs compress themselves
+    lifespan=lifespan,
+)
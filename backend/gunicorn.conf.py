@@ -0,0 +1,25 @@
+# Loaded automatically by gunicorn from the working directory (or pass -c gunicorn.conf.py)
+import os
+
+# Set to aggregate /metrics across workers (see METRICS in app.py)
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+def on_starting(server):
+    # Samples left by a previous run would be summed into this one's
+    if PROMETHEUS_MULTIPROC_DIR:
+        os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+        for name in os.listdir(PROMETHEUS_MULTIPROC_DIR):
+            if name.endswith(".db"):
+                os.remove(os.path.join(PROMETHEUS_MULTIPROC_DIR, name))
+
+def post_worker_init(worker):
+    # Start the app's background threads in each worker once it has loaded the app; with
+    # --preload the app was imported in the master, where threads would not reach the workers
+    from app import start_background_threads
+    start_background_threads()
+
+def child_exit(server, worker):
+    # Drop the exited worker's live samples so they are not reported alongside its replacement's
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,152 @@
+"""
+Background jobs for the discrepancy analysis.
+
+With CELERY_BROKER_URL set (and celery installed) jobs are queued to Celery workers,
+which scale independently of the web processes:
+
+    CELERY_BROKER_URL=redis://localhost:6379/0 celery -A tasks worker --loglevel=info
+
+Otherwise jobs run on a small in-process thread pool. Their state is kept in Redis when
+REDIS_URL is set, so any web process can answer the poll for a job another one accepted.
+Without either, job state lives in the accepting process only, which is correct for a
+single web process (flask run) and must be opted into with JOBS_IN_PROCESS=1; the job
+endpoints answer 503 otherwise.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from celery import Celery
+    from celery.result import AsyncResult
+except ImportError:  # celery is optional; jobs then run in-process
+    Celery = None
+try:
+    import redis
+except ImportError:  # redis is optional; in-process job state is then per process
+    redis = None
+
+BROKER_URL = os.getenv("CELERY_BROKER_URL")
+RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", BROKER_URL)
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+# Jobs accepted but not yet finished in this process; further submissions are refused
+MAX_PENDING_JOBS = int(os.getenv("MAX_PENDING_JOBS", "256"))
+REDIS_URL = os.getenv("REDIS_URL")
+IN_PROCESS = os.getenv("JOBS_IN_PROCESS", "").lower() in ("1", "true", "yes")
+
+celery = None
+if Celery and BROKER_URL:
+    celery = Celery("potion_guard", broker=BROKER_URL, backend=RESULT_BACKEND)
+    celery.conf.update(task_serializer="json", result_serializer="json", result_expires=JOB_RESULT_TTL)
+
+REDIS = redis.Redis.from_url(REDIS_URL) if redis and REDIS_URL and celery is None else None
+
+class JobQueueFull(Exception):
+    """Raised by submit_discrepancies when MAX_PENDING_JOBS jobs are already pending here."""
+
+def available() -> bool:
+    # Whether a poll can reach the job's state from any web process (or one was opted into)
+    return celery is not None or REDIS is not None or IN_PROCESS
+
+def run_discrepancies(start: int, end: int) -> List[Dict[str, Any]]:
+    # Imported here because app imports this module; reuses the app's per-range result cache
+    from app import discrepancies_for
+    return discrepancies_for(start, end)
+
+if celery is not None:
+    discrepancies_task = celery.task(name="potion_guard.discrepancies")(run_discrepancies)
+
+# In-process jobs: job id -> (Future, submitted at). Finished jobs are dropped JOB_RESULT_TTL
+# seconds after submission, or earlier (oldest first) to make room for a new one; pending
+# jobs are never dropped, a full table refuses new work instead
+_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("JOB_WORKERS", "2")), thread_name_prefix="job")
+_JOBS: Dict[str, Tuple[Future, float]] = {}
+_JOBS_LOCK = threading.Lock()
+
+def _job_key(job_id: str) -> str:
+    return f"potion-guard:job:{job_id}"
+
+def _record(job_id: str, **fields: str) -> None:
+    pipe = REDIS.pipeline()
+    pipe.hset(_job_key(job_id), mapping=fields)
+    pipe.expire(_job_key(job_id), JOB_RESULT_TTL)
+    pipe.execute()
+
+def _run_recorded(job_id: str, start: int, end: int) -> List[Dict[str, Any]]:
+    # Run the job and mirror its state into Redis for whichever process is polled
+    _record(job_id, state="STARTED")
+    try:
+        result = run_discrepancies(start, end)
+    except Exception as exc:
+        _record(job_id, state="FAILURE", error=str(exc))
+        raise
+    _record(job_id, state="SUCCESS", result=json.dumps(result))
+    return result
+
+def _reserve_slot(now: float) -> None:
+    # Called with _JOBS_LOCK held: expire old finished jobs, then evict the oldest finished
+    # one if the table is still full; raises JobQueueFull when every job is pending
+    for job_id, (future, submitted) in list(_JOBS.items()):
+        if future.done() and now - submitted >= JOB_RESULT_TTL:
+            del _JOBS[job_id]
+    if len(_JOBS) < MAX_PENDING_JOBS:
+        return
+    for job_id, (future, _) in _JOBS.items():
+        if future.done():
+            del _JOBS[job_id]
+            return
+    raise JobQueueFull(f"{MAX_PENDING_JOBS} jobs already pending")
+
+def submit_discrepancies(start: int, end: int) -> str:
+    # Queue an analysis of [start, end] and return its job id
+    if celery is not None:
+        return discrepancies_task.delay(start, end).id
+    job_id = uuid.uuid4().hex
+    with _JOBS_LOCK:
+        now = time.time()
+        _reserve_slot(now)
+        if REDIS is not None:
+            _record(job_id, state="PENDING")
+            future: Future = _EXECUTOR.submit(_run_recorded, job_id, start, end)
+        else:
+            future = _EXECUTOR.submit(run_discrepancies, start, end)
+        _JOBS[job_id] = (future, now)
+    return job_id
+
+def job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    # {"state": ...} plus "result" on success or "error" on failure; None for unknown ids
+    if celery is not None:
+        # Celery cannot tell unknown ids from queued ones; both report PENDING
+        res = AsyncResult(job_id, app=celery)
+        if res.successful():
+            return {"state": "SUCCESS", "result": res.result}
+        if res.failed():
+            return {"state": "FAILURE", "error": str(res.result)}
+        return {"state": res.state}
+    if REDIS is not None:
+        fields = {k.decode(): v.decode() for k, v in REDIS.hgetall(_job_key(job_id)).items()}
+        if not fields:
+            return None
+        status: Dict[str, Any] = {"state": fields["state"]}
+        if "result" in fields:
+            status["result"] = json.loads(fields["result"])
+        if "error" in fields:
+            status["error"] = fields["error"]
+        return status
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+    if job is None:
+        return None
+    future = job[0]
+    if not future.done():
+        return {"state": "STARTED" if future.running() else "PENDING"}
+    exc = future.exception()
+    if exc is not None:
+        return {"state": "FAILURE", "error": str(exc)}
+    return {"state": "SUCCESS", "result": future.result()}
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the backend modules the way app.py does, with backend/ on the path
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if BACKEND not in sys.path:
+    sys.path.insert(0, BACKEND)
@@ -0,0 +1,97 @@
+"""
+Checks the drain scans and ticket matching against small hand-computed fixtures.
+
+Numba installs run scan_drains_loop compiled and NumPy-only installs run
+scan_drains_vectorized, so both are tested directly whichever is installed.
+"""
+import numpy as np
+import pytest
+
+from analysis.discrepancy_detector import (
+    NS_PER_MINUTE,
+    match_tickets,
+    scan_drains,
+    scan_drains_loop,
+    scan_drains_vectorized,
+)
+
+# One sample per minute, filling at 2 L/min between two drains:
+#   drain 1: indices 3..6, 14 -> 4 over 3 min  => (14 - 4) + 2 * 3 = 16
+#   drain 2: indices 8..10, 8 -> 3 over 2 min  => (8 - 3) + 2 * 2 = 9
+LEVELS = np.array([10, 10, 12, 14, 8, 4, 4, 6, 8, 3, 3], dtype=np.float64)
+TIMESTAMPS = np.arange(LEVELS.size, dtype=np.int64) * NS_PER_MINUTE
+FILL_RATE = 2.0
+
+SCANS = pytest.mark.parametrize("scan", [scan_drains_loop, scan_drains_vectorized, scan_drains],
+                                ids=["loop", "vectorized", "scan_drains"])
+
+
+@SCANS
+def test_scan_finds_hand_computed_drains(scan):
+    starts, ends, volumes = scan(TIMESTAMPS, LEVELS, FILL_RATE, 1.0)
+    assert starts.tolist() == [3, 8]
+    assert ends.tolist() == [6, 10]
+    np.testing.assert_allclose(volumes, [16.0, 9.0])
+
+
+@SCANS
+def test_scan_drops_drains_at_or_below_min_volume(scan):
+    starts, ends, volumes = scan(TIMESTAMPS, LEVELS, FILL_RATE, 9.0)
+    assert starts.tolist() == [3]
+    assert ends.tolist() == [6]
+    np.testing.assert_allclose(volumes, [16.0])
+
+
+@SCANS
+def test_scan_without_drops_is_empty(scan):
+    levels = np.array([1, 2, 2, 3], dtype=np.float64)
+    starts, ends, volumes = scan(TIMESTAMPS[:4], levels, FILL_RATE, 0.0)
+    assert starts.size == ends.size == volumes.size == 0
+
+
+def test_scans_agree_on_random_histories():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(2, 60))
+        levels = np.round(rng.normal(0, 5, n).cumsum(), 1)
+        ts = np.sort(rng.choice(10_000, n, replace=False)).astype(np.int64) * NS_PER_MINUTE
+        expected = scan_drains_loop(ts, levels, 0.5, 2.0)
+        actual = scan_drains_vectorized(ts, levels, 0.5, 2.0)
+        for want, got in zip(expected, actual):
+            np.testing.assert_allclose(got, want)
+
+
+def test_match_tickets_sums_per_day_and_cauldron():
+    drains = [
+        {"date": "2025-01-01", "cauldron_id": "c1", "true_volume": 100.0},
+        {"date": "2025-01-01", "cauldron_id": "c1", "true_volume": 50.0},
+        {"date": "2025-01-01", "cauldron_id": "c2", "true_volume": 30.0},
+        {"date": "2025-01-02", "cauldron_id": "c1", "true_volume": 40.0},
+    ]
+    tickets = {"transport_tickets": [
+        {"date": "2025-01-01", "cauldron_id": "c1", "amount_collected": 140},
+        {"date": "2025-01-01T09:30:00Z", "cauldronId": "c2", "amount_collected": 30},
+        {"date": "2025-01-02", "cauldron_id": "c3", "amount_collected": 20},
+        # No drains recorded that day, so the ticket is not compared
+        {"date": "2025-01-03", "cauldron_id": "c1", "amount_collected": 99},
+        # No cauldron id, so the ticket is skipped
+        {"date": "2025-01-02", "amount_collected": 5},
+    ]}
+
+    result = match_tickets(drains, tickets, cauldron_info={"c1": "Alpha"})
+
+    assert result == [
+        {"date": "2025-01-01", "cauldron_id": "c1", "cauldron_name": "Alpha",
+         "expected_volume": 140.0, "actual_volume": 150.0, "missing_volume": 10.0},
+        {"date": "2025-01-01", "cauldron_id": "c2", "cauldron_name": "c2",
+         "expected_volume": 30.0, "actual_volume": 30.0, "missing_volume": 0.0},
+        {"date": "2025-01-02", "cauldron_id": "c1", "cauldron_name": "Alpha",
+         "expected_volume": 0.0, "actual_volume": 40.0, "missing_volume": 40.0},
+        {"date": "2025-01-02", "cauldron_id": "c3", "cauldron_name": "c3",
+         "expected_volume": 20.0, "actual_volume": 0.0, "missing_volume": -20.0},
+    ]
+
+
+def test_match_tickets_without_drains_is_empty():
+    tickets = [{"date": "2025-01-01", "cauldron_id": "c1", "amount_collected": 10}]
+    assert match_tickets([], tickets) == []
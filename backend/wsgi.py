@@ -0,0 +1,30 @@
+"""
+WSGI entry point for production servers.
+
+    GEVENT_PATCH=1 gunicorn -k gevent -w 4 --worker-connections 1000 wsgi:app
+    uwsgi --ini uwsgi.ini
+
+Both servers may import this module in a parent process and fork the workers from it, so
+the app's background threads are started after fork, in each worker: by a uWSGI postfork
+hook here, or by the post_worker_init hook in gunicorn.conf.py.
+"""
+import os
+
+os.environ["BACKGROUND_THREADS"] = "postfork"
+
+from app import app, start_background_threads
+
+try:
+    import uwsgi
+    from uwsgidecorators import postfork
+except ImportError:  # not running under uWSGI
+    uwsgi = None
+
+if uwsgi is not None:
+    if uwsgi.worker_id() > 0:
+        # lazy-apps: this module is already being loaded in a worker
+        start_background_threads()
+    else:
+        postfork(start_background_threads)
+
+__all__ = ["app"]